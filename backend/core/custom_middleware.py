@@ -36,3 +36,21 @@ def add_user_info_to_log_entry(sender, instance, created, **kwargs):
             # Fail silently if there's any issue
             logger.debug("audit log enrichment with actor failed.")
             pass
+
+
+class RequestCacheMiddleware:
+    """
+    Enable the request-scoped cache of iam.models for the duration of each request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from iam.models import _request_cache
+
+        _request_cache.store = {}
+        try:
+            return self.get_response(request)
+        finally:
+            del _request_cache.store
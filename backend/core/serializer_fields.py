@@ -42,7 +42,7 @@ class FieldsRelatedField(serializers.RelatedField):
     ) -> dict[str, Any]:
         res = {"str": str(value)}
 
-        if value == Folder.get_root_folder():
+        if isinstance(value, Folder) and value.pk == Folder.get_root_folder_id():
             res.update({"id": value.id})
             return res
 
@@ -845,71 +845,42 @@ def startup(sender: AppConfig, **kwargs):
     domain_manager.permissions.set(domain_manager_permissions)
     administrator, created = Role.objects.get_or_create(name="BI-RL-ADM", builtin=True)
     administrator.permissions.set(administrator_permissions)
-    # if global administrators user group does not exist, then create it
-    if not UserGroup.objects.filter(
-        name="BI-UG-ADM", folder=Folder.get_root_folder()
-    ).exists():
-        administrators = UserGroup.objects.create(
-            name="BI-UG-ADM", folder=Folder.get_root_folder(), builtin=True
-        )
-        ra1 = RoleAssignment.objects.create(
-            user_group=administrators,
-            role=Role.objects.get(name="BI-RL-ADM"),
-            is_recursive=True,
-            builtin=True,
-            folder=Folder.get_root_folder(),
-        )
-        ra1.perimeter_folders.add(administrators.folder)
-    # if global readers user group does not exist, then create it
-    if not UserGroup.objects.filter(
-        name="BI-UG-GAD", folder=Folder.get_root_folder()
-    ).exists():
-        global_readers = UserGroup.objects.create(
-            name="BI-UG-GAD",
-            folder=Folder.objects.get(content_type=Folder.ContentType.ROOT),
-            builtin=True,
-        )
-        ra2 = RoleAssignment.objects.create(
-            user_group=global_readers,
-            role=Role.objects.get(name="BI-RL-AUD"),
-            is_recursive=True,
-            builtin=True,
-            folder=Folder.get_root_folder(),
-        )
-        ra2.perimeter_folders.add(global_readers.folder)
-    if not UserGroup.objects.filter(
-        name=UserGroupCodename.ANALYST.value, folder=Folder.get_root_folder()
-    ).exists():
-        analysts = UserGroup.objects.create(
-            name=UserGroupCodename.ANALYST.value,
-            folder=Folder.get_root_folder(),
-            builtin=True,
-        )
-        ra2 = RoleAssignment.objects.create(
-            user_group=analysts,
-            role=Role.objects.get(name=RoleCodename.ANALYST.value),
-            is_recursive=True,
-            builtin=True,
-            folder=Folder.get_root_folder(),
-        )
-        ra2.perimeter_folders.add(analysts.folder)
-    # if global approvers user group does not exist, then create it
-    if not UserGroup.objects.filter(
-        name="BI-UG-GAP", folder=Folder.get_root_folder()
-    ).exists():
-        global_approvers = UserGroup.objects.create(
-            name="BI-UG-GAP",
-            folder=Folder.objects.get(content_type=Folder.ContentType.ROOT),
-            builtin=True,
+    # create the global user groups that do not exist, with their role assignments
+    root_folder = Folder.get_root_folder()
+    existing_user_groups = set(
+        UserGroup.objects.filter(folder=root_folder).values_list("name", flat=True)
+    )
+    global_user_groups = [
+        ("BI-UG-ADM", administrator),
+        ("BI-UG-GAD", reader),
+        (UserGroupCodename.ANALYST.value, analyst),
+        ("BI-UG-GAP", approver),
+    ]
+    role_assignments = []
+    for user_group_name, role in global_user_groups:
+        if user_group_name in existing_user_groups:
+            continue
+        user_group = UserGroup.objects.create(
+            name=user_group_name, folder=root_folder, builtin=True
         )
-        ra2 = RoleAssignment.objects.create(
-            user_group=global_approvers,
-            role=Role.objects.get(name="BI-RL-APP"),
-            is_recursive=True,
-            builtin=True,
-            folder=Folder.get_root_folder(),
+        role_assignments.append(
+            RoleAssignment.objects.create(
+                user_group=user_group,
+                role=role,
+                is_recursive=True,
+                builtin=True,
+                folder=root_folder,
+            )
         )
-        ra2.perimeter_folders.add(global_approvers.folder)
+    # a single insert for all the perimeters
+    through = RoleAssignment.perimeter_folders.through
+    through.objects.bulk_create(
+        [
+            through(roleassignment_id=ra.id, folder_id=root_folder.id)
+            for ra in role_assignments
+        ],
+        ignore_conflicts=True,
+    )
 
     third_party_respondent_permissions = Permission.objects.filter(
         codename__in=THIRD_PARTY_RESPONDENT_PERMISSIONS_LIST
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.10 on 2026-10-15 11:29
+
+import django.db.models.deletion
+import iam.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("iam", "0013_personalaccesstoken"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="folder",
+            name="parent_folder",
+            field=models.ForeignKey(
+                default=iam.models._get_root_folder_id,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="iam.folder",
+                verbose_name="parent folder",
+            ),
+        ),
+    ]
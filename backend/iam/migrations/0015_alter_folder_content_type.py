@@ -0,0 +1,26 @@
+# Generated by Django 5.1.10 on 2026-10-15 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("iam", "0014_alter_folder_parent_folder"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="folder",
+            name="content_type",
+            field=models.CharField(
+                choices=[
+                    ("GL", "GLOBAL"),
+                    ("DO", "DOMAIN"),
+                    ("EN", "ENCLAVE"),
+                ],
+                db_index=True,
+                default="DO",
+                max_length=2,
+            ),
+        ),
+    ]
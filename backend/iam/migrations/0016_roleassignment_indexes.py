@@ -0,0 +1,46 @@
+# Generated by Django 5.1.10 on 2026-10-15 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("iam", "0015_alter_folder_content_type"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="roleassignment",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="roleassignment",
+            name="user_group",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="iam.usergroup",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="roleassignment",
+            index=models.Index(
+                fields=["user", "role"], name="iam_roleass_user_id_cb55a5_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="roleassignment",
+            index=models.Index(
+                fields=["user_group", "role"], name="iam_roleass_user_gr_4db7f5_idx"
+            ),
+        ),
+    ]
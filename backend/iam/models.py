@@ -2,15 +2,24 @@
 Inspired from Azure IAM model"""
 
 from collections import defaultdict
-from typing import Any, List, Self, Tuple, Generator
+import threading
+from functools import lru_cache, wraps
+from operator import attrgetter
+from typing import Any, Iterable, List, Self, Tuple, Generator
 import uuid
 from allauth.account.models import EmailAddress
 from django.utils import timezone
-from django.db import models
+from django.utils.functional import cached_property
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AnonymousUser, Permission
-from django.utils.translation import gettext_lazy as _
+from django.contrib.contenttypes.models import ContentType
+from django.utils.translation import get_language, gettext_lazy as _
 from django.urls.base import reverse_lazy
 from knox.models import AuthToken
 from core.utils import (
@@ -46,6 +55,22 @@ logger = structlog.get_logger(__name__)
 from auditlog.registry import auditlog
 
 
+@lru_cache(maxsize=4096)
+def _get_permission_label(
+    app_label: str, model: str, name: str, language: str | None
+) -> str:
+    """helper function returning the label of a permission, as str(permission) does
+    Labels are memoized by natural key and language, not by id, as a backup restore
+    may recreate the permissions with other ids"""
+    return f"{ContentType(app_label=app_label, model=model)} | {name}"
+
+
+# request-scoped cache, enabled by core.custom_middleware.RequestCacheMiddleware.
+# Nothing is cached at process level (root folder id, permission ids, SSO settings),
+# as other workers would keep a stale value after an update or a backup restore.
+_request_cache = threading.local()
+
+
 def _get_root_folder():
     """helper function outside of class to facilitate serialization
     to be used only in Folder class"""
@@ -55,6 +80,149 @@ def _get_root_folder():
         return None
 
 
+def _get_root_folder_id():
+    """helper function outside of class returning the id of the root folder,
+    cached for the current request"""
+    store = getattr(_request_cache, "store", None)
+    if store is not None and "root_folder_id" in store:
+        return store["root_folder_id"]
+    try:
+        root_folder_id = Folder.objects.values_list("id", flat=True).get(
+            content_type=Folder.ContentType.ROOT
+        )
+    except Folder.DoesNotExist:
+        return None
+    if store is not None:
+        store["root_folder_id"] = root_folder_id
+    return root_folder_id
+
+
+def _get_permission_id(codename: str) -> int:
+    """helper function returning the id of a permission from its codename
+    The ids are memoized for the current request only: a backup restore recreates
+    the permissions with new ids, which other workers would not notice"""
+    store = getattr(_request_cache, "store", None)
+    if store is not None and codename in store.get("permission_ids", {}):
+        return store["permission_ids"][codename]
+    permission_id = Permission.objects.values_list("id", flat=True).get(
+        codename=codename
+    )
+    if store is not None:
+        store.setdefault("permission_ids", {})[codename] = permission_id
+    return permission_id
+
+
+def _get_sso_settings() -> dict:
+    """helper function returning the SSO settings dict, cached for the current request"""
+    from global_settings.models import GlobalSettings
+
+    store = getattr(_request_cache, "store", None)
+    if store is not None and "sso_settings" in store:
+        return store["sso_settings"]
+    try:
+        sso_settings = GlobalSettings.objects.get(name=GlobalSettings.Names.SSO).value
+    except GlobalSettings.DoesNotExist:
+        sso_settings = {}
+    if store is not None:
+        store["sso_settings"] = sso_settings
+    return sso_settings
+
+
+@receiver([post_save, post_delete], sender="global_settings.GlobalSettings")
+def reset_sso_settings_cache(sender, instance, **kwargs):
+    """reset the cached SSO settings when they are saved or deleted"""
+    store = getattr(_request_cache, "store", None)
+    if store is not None and instance.name == sender.Names.SSO:
+        store.pop("sso_settings", None)
+
+
+def _cached_per_request(method):
+    """
+    memoize a RoleAssignment helper per principal for the current request
+    The cached values are dropped by reset_rbac_request_cache on any RBAC change
+    """
+
+    @wraps(method)
+    def wrapper(principal, *args, **kwargs):
+        store = getattr(_request_cache, "store", None)
+        if store is None or principal.pk is None:
+            return method(principal, *args, **kwargs)
+        key = (
+            method.__name__,
+            type(principal),
+            principal.pk,
+            args,
+            frozenset(kwargs.items()),
+        )
+        rbac_store = store.setdefault("rbac", {})
+        if key not in rbac_store:
+            rbac_store[key] = method(principal, *args, **kwargs)
+        return rbac_store[key]
+
+    return wrapper
+
+
+def _reset_rbac_request_cache():
+    """helper function dropping the RBAC values cached for the current request"""
+    store = getattr(_request_cache, "store", None)
+    if store is not None:
+        store.pop("rbac", None)
+
+
+def _get_role_permissions(role_assignments) -> dict[Any, set]:
+    """helper function grouping the prefetched permissions of role assignments by role id,
+    each role being read once even when it is shared by several role assignments"""
+    role_permissions = {}
+    for ra in role_assignments:
+        if ra.role_id not in role_permissions:
+            role_permissions[ra.role_id] = {p.id for p in ra.role.permissions.all()}
+    return role_permissions
+
+
+def _get_editor_permissions():
+    """helper function returning the permissions that make a user an editor,
+    i.e. add, change and delete permissions"""
+    return Permission.objects.filter(
+        Q(codename__startswith="add_")
+        | Q(codename__startswith="change_")
+        | Q(codename__startswith="delete_")
+    )
+
+
+# Paths to try in order to get the folder of an object. Each path is a list representing
+# the traversal path.
+# NOTE: There are probably better ways to represent these, but it works.
+_FOLDER_PATHS = [
+    ["folder"],
+    ["parent_folder"],
+    ["perimeter", "folder"],
+    ["entity", "folder"],
+    ["provider_entity", "folder"],
+    ["solution", "provider_entity", "folder"],
+    ["risk_assessment", "perimeter", "folder"],
+    ["risk_scenario", "risk_assessment", "perimeter", "folder"],
+    ["compliance_assessment", "perimeter", "folder"],
+]
+# fields loaded by the folder tree walks, enough for paths and permission checks
+_FOLDER_WALK_FIELDS = ("id", "name", "content_type", "parent_folder")
+# precompiled getters of all the folder paths, for objects that are not models
+_FOLDER_PATH_GETTERS = [(path, attrgetter(".".join(path))) for path in _FOLDER_PATHS]
+# getters of the folder paths applicable to a model class, see Folder.get_folder
+_FOLDER_GETTERS: dict[type, tuple[attrgetter, ...]] = {}
+# lookups from an object to its folder, by priority, see get_accessible_object_ids
+_OBJECT_FOLDER_LOOKUPS = [
+    ("folder", "folder"),
+    ("risk_assessment", "risk_assessment__folder"),
+    ("entity", "entity__folder"),
+    ("provider_entity", "provider_entity__folder"),
+    ("parent_folder", None),  # folders are their own folder
+]
+# permission flags of the objects, see get_accessible_object_ids
+_VIEW_FLAG, _CHANGE_FLAG, _DELETE_FLAG = 1, 2, 4
+# folder lookup and publishing capability of each object type, computed once per type
+_OBJECT_TYPE_FOLDER_INFO: dict[type, tuple[str | None, bool, bool]] = {}
+
+
 class Folder(NameDescriptionMixin):
     """A folder is a container for other folders or any object
     Folders are organized in a tree structure, with a single root folder
@@ -69,10 +237,7 @@ class Folder(NameDescriptionMixin):
     @staticmethod
     def get_root_folder_id() -> uuid.UUID:
         """class function for general use"""
-        try:
-            return _get_root_folder().id
-        except:
-            return _get_root_folder()
+        return _get_root_folder_id()
 
     class ContentType(models.TextChoices):
         """content type for a folder"""
@@ -82,7 +247,10 @@ class Folder(NameDescriptionMixin):
         ENCLAVE = "EN", _("ENCLAVE")
 
     content_type = models.CharField(
-        max_length=2, choices=ContentType.choices, default=ContentType.DOMAIN
+        max_length=2,
+        choices=ContentType.choices,
+        default=ContentType.DOMAIN,
+        db_index=True,
     )
 
     parent_folder = models.ForeignKey(
@@ -90,7 +258,7 @@ class Folder(NameDescriptionMixin):
         null=True,
         on_delete=models.CASCADE,
         verbose_name=_("parent folder"),
-        default=_get_root_folder,
+        default=_get_root_folder_id,
     )
     builtin = models.BooleanField(default=False)
 
@@ -105,22 +273,135 @@ class Folder(NameDescriptionMixin):
     def __str__(self) -> str:
         return self.name.__str__()
 
+    @staticmethod
+    def _folder_tree_query(
+        template: str, folder_ids: Iterable[uuid.UUID]
+    ) -> tuple[str, list]:
+        """
+        Format the SQL template of a recursive query on the folder tree, with the quoted
+        {table}, {id_column} and {parent_column} names and the {placeholders} of the
+        given folder ids. Return the query and its params.
+        """
+        pk = Folder._meta.pk
+        params = [
+            pk.get_db_prep_value(folder_id, connection) for folder_id in folder_ids
+        ]
+        query = template.format(
+            table=connection.ops.quote_name(Folder._meta.db_table),
+            id_column=connection.ops.quote_name(pk.column),
+            parent_column=connection.ops.quote_name(
+                Folder._meta.get_field("parent_folder").column
+            ),
+            placeholders=", ".join(["%s"] * len(params)),
+        )
+        return query, params
+
+    @staticmethod
+    def _fetch_folder_ids(query: str, params: list) -> list[tuple]:
+        """Run a raw query on the folder tree, every returned column being a folder id"""
+        pk = Folder._meta.pk
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return [tuple(map(pk.to_python, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def get_sub_folders_bulk(folder_ids: Iterable[uuid.UUID]) -> set[uuid.UUID]:
+        """
+        Return the ids of all the subfolders of the given folders, at any depth.
+        The folder tree is walked by the database in a single recursive query.
+        """
+        return set().union(*Folder.get_sub_folders_map(folder_ids).values())
+
+    @staticmethod
+    def get_sub_folders_map(
+        folder_ids: Iterable[uuid.UUID],
+    ) -> dict[uuid.UUID, set[uuid.UUID]]:
+        """
+        Return the ids of all the subfolders of each of the given folders, at any depth.
+        Folders without subfolders are absent from the result.
+        The folder tree is walked by the database in a single recursive query.
+        """
+        query, params = Folder._folder_tree_query(
+            """
+            WITH RECURSIVE sub_folders(root_id, id) AS (
+                SELECT {parent_column}, {id_column} FROM {table}
+                WHERE {parent_column} IN ({placeholders})
+                UNION
+                SELECT s.root_id, f.{id_column} FROM {table} f
+                JOIN sub_folders s ON f.{parent_column} = s.id
+            )
+            SELECT root_id, id FROM sub_folders
+            """,
+            folder_ids,
+        )
+        if not params:
+            return {}
+        sub_folders = defaultdict(set)
+        for root_id, folder_id in Folder._fetch_folder_ids(query, params):
+            sub_folders[root_id].add(folder_id)
+        return dict(sub_folders)
+
     def get_sub_folders(self) -> Generator[Self, None, None]:
-        """Return the list of subfolders"""
+        """
+        Return the list of subfolders
+        Folders are partially loaded (see _FOLDER_WALK_FIELDS), other fields are
+        fetched with an extra query on access
+        """
+        yield from Folder.objects.filter(
+            id__in=Folder.get_sub_folders_bulk([self.id])
+        ).only(*_FOLDER_WALK_FIELDS)
 
-        def sub_folders_in(folder):
-            for sub_folder in folder.folder_set.all():
-                yield sub_folder
-                yield from sub_folders_in(sub_folder)
+    @staticmethod
+    def _parent_folders_cte(folder_ids: Iterable[uuid.UUID]) -> tuple[str, list]:
+        """
+        Return the SQL and params of a recursive CTE parent_folders(id, parent_id, depth)
+        walking up from the given folders (depth 0) to the root, to be followed by a SELECT.
+        """
+        return Folder._folder_tree_query(
+            """
+            WITH RECURSIVE parent_folders(id, parent_id, depth) AS (
+                SELECT {id_column}, {parent_column}, 0 FROM {table}
+                WHERE {id_column} IN ({placeholders})
+                UNION ALL
+                SELECT f.{id_column}, f.{parent_column}, p.depth + 1 FROM {table} f
+                JOIN parent_folders p ON f.{id_column} = p.parent_id
+            )
+            """,
+            folder_ids,
+        )
 
-        yield from sub_folders_in(self)
+    @staticmethod
+    def get_parent_folders_ids(folder_id: uuid.UUID) -> list[uuid.UUID]:
+        """
+        Return the ids of the parent folders of a folder, from its parent up to the root.
+        The folder tree is walked by the database in a single recursive query.
+        """
+        query, params = Folder._parent_folders_cte([folder_id])
+        query += "SELECT id FROM parent_folders WHERE depth > 0 ORDER BY depth"
+        return [row[0] for row in Folder._fetch_folder_ids(query, params)]
 
     # Should we update data-model.md now that this method is a generator ?
     def get_parent_folders(self) -> Generator[Self, None, None]:
-        """Return the list of parent folders"""
-        current_folder = self
-        while (current_folder := current_folder.parent_folder) is not None:
-            yield current_folder
+        """
+        Return the list of parent folders
+        They are fetched in a single query, then ordered by walking up the tree.
+        Folders are partially loaded (see _FOLDER_WALK_FIELDS), other fields are
+        fetched with an extra query on access
+        """
+        if self.parent_folder_id is None:
+            return
+        # start from the parent folder so that it also works for unsaved folders
+        query, params = Folder._parent_folders_cte([self.parent_folder_id])
+        parent_folders = {
+            folder.id: folder
+            for folder in Folder.objects.only(*_FOLDER_WALK_FIELDS).filter(
+                id__in=RawSQL(query + "SELECT id FROM parent_folders", params)
+            )
+        }
+        folder = parent_folders.get(self.parent_folder_id)
+        while folder is not None:
+            yield folder
+            folder = parent_folders.get(folder.parent_folder_id)
 
     def get_folder_full_path(self, include_root: bool = False) -> list[Self]:
         """
@@ -158,6 +439,22 @@ class Folder(NameDescriptionMixin):
                 return None
         return current
 
+    @staticmethod
+    def _get_folder_getters(model: type[models.Model]) -> tuple[attrgetter, ...]:
+        """
+        Return the attribute getters of the folder paths whose first attribute exists
+        on the model class. They are computed once per class.
+        """
+        getters = _FOLDER_GETTERS.get(model)
+        if getters is None:
+            getters = tuple(
+                attrgetter(".".join(path))
+                for path in _FOLDER_PATHS
+                if hasattr(model, path[0])
+            )
+            _FOLDER_GETTERS[model] = getters
+        return getters
+
     @staticmethod
     def get_folder(obj: Any):
         """
@@ -166,23 +463,31 @@ class Folder(NameDescriptionMixin):
         """
         if isinstance(obj, Folder):
             return obj
-        # Define paths to try in order. Each path is a list representing the traversal path.
-        # NOTE: There are probably better ways to represent these, but it works.
-        paths = [
-            ["folder"],
-            ["parent_folder"],
-            ["perimeter", "folder"],
-            ["entity", "folder"],
-            ["provider_entity", "folder"],
-            ["solution", "provider_entity", "folder"],
-            ["risk_assessment", "perimeter", "folder"],
-            ["risk_scenario", "risk_assessment", "perimeter", "folder"],
-            ["compliance_assessment", "perimeter", "folder"],
-        ]
-
-        # Attempt to traverse each path until a valid folder is found or all paths are exhausted.
-        for path in paths:
-            folder = Folder._navigate_structure(obj, path)
+        if isinstance(obj, models.Model):
+            # Only try the paths applicable to the model class, with precompiled getters.
+            for getter in Folder._get_folder_getters(type(obj)):
+                try:
+                    folder = getter(obj)
+                except AttributeError:
+                    continue
+                if folder is not None:
+                    return folder
+            return None
+
+        if isinstance(obj, dict):
+            # Attempt to traverse each path until a valid folder is found or all paths are exhausted.
+            for path in _FOLDER_PATHS:
+                folder = Folder._navigate_structure(obj, path)
+                if folder is not None:
+                    return folder
+            return None
+
+        for path, getter in _FOLDER_PATH_GETTERS:
+            try:
+                folder = getter(obj)
+            except AttributeError:
+                # missing attribute, or a dictionary somewhere along the path
+                folder = Folder._navigate_structure(obj, path)
             if folder is not None:
                 return folder
 
@@ -190,53 +495,59 @@ class Folder(NameDescriptionMixin):
         return None
 
     @staticmethod
+    @transaction.atomic
     def create_default_ug_and_ra(folder: Self):
         if folder.content_type == Folder.ContentType.DOMAIN:
-            readers = UserGroup.objects.create(
-                name=UserGroupCodename.READER, folder=folder, builtin=True
-            )
-            approvers = UserGroup.objects.create(
-                name=UserGroupCodename.APPROVER, folder=folder, builtin=True
-            )
-            analysts = UserGroup.objects.create(
-                name=UserGroupCodename.ANALYST, folder=folder, builtin=True
-            )
-            managers = UserGroup.objects.create(
-                name=UserGroupCodename.DOMAIN_MANAGER, folder=folder, builtin=True
-            )
-            ra1 = RoleAssignment.objects.create(
-                user_group=readers,
-                role=Role.objects.get(name=RoleCodename.READER),
-                builtin=True,
-                folder=Folder.get_root_folder(),
-                is_recursive=True,
-            )
-            ra1.perimeter_folders.add(folder)
-            ra2 = RoleAssignment.objects.create(
-                user_group=approvers,
-                role=Role.objects.get(name=RoleCodename.APPROVER),
-                builtin=True,
-                folder=Folder.get_root_folder(),
-                is_recursive=True,
+            default_roles = [
+                (UserGroupCodename.READER, RoleCodename.READER),
+                (UserGroupCodename.APPROVER, RoleCodename.APPROVER),
+                (UserGroupCodename.ANALYST, RoleCodename.ANALYST),
+                (UserGroupCodename.DOMAIN_MANAGER, RoleCodename.DOMAIN_MANAGER),
+            ]
+            roles = {
+                role.name: role
+                for role in Role.objects.filter(
+                    name__in=[str(role_name) for ug_name, role_name in default_roles]
+                )
+            }
+            user_groups = UserGroup.objects.bulk_create(
+                [
+                    UserGroup(name=str(ug_name), folder=folder, builtin=True)
+                    for ug_name, role_name in default_roles
+                ]
             )
-            ra2.perimeter_folders.add(folder)
-            ra3 = RoleAssignment.objects.create(
-                user_group=analysts,
-                role=Role.objects.get(name=RoleCodename.ANALYST),
-                builtin=True,
-                folder=Folder.get_root_folder(),
-                is_recursive=True,
+            root_folder_id = Folder.get_root_folder_id()
+            role_assignments = RoleAssignment.objects.bulk_create(
+                [
+                    RoleAssignment(
+                        user_group=user_group,
+                        role=roles[str(role_name)],
+                        builtin=True,
+                        folder_id=root_folder_id,
+                        is_recursive=True,
+                    )
+                    for user_group, (ug_name, role_name) in zip(
+                        user_groups, default_roles
+                    )
+                ]
             )
-            ra3.perimeter_folders.add(folder)
-            ra4 = RoleAssignment.objects.create(
-                user_group=managers,
-                role=Role.objects.get(name=RoleCodename.DOMAIN_MANAGER),
-                builtin=True,
-                folder=Folder.get_root_folder(),
-                is_recursive=True,
+            through = RoleAssignment.perimeter_folders.through
+            through.objects.bulk_create(
+                [
+                    through(roleassignment_id=ra.id, folder_id=folder.id)
+                    for ra in role_assignments
+                ]
             )
-            ra4.perimeter_folders.add(folder)
             # Clear the cache after a new folder is created - purposely clearing everything
+            _reset_rbac_request_cache()
+
+
+@receiver([post_save, post_delete], sender=Folder)
+def reset_root_folder_cache(sender, instance, **kwargs):
+    """reset the cached root folder id when the root folder is saved or deleted"""
+    store = getattr(_request_cache, "store", None)
+    if store is not None and instance.content_type == Folder.ContentType.ROOT:
+        store.pop("root_folder_id", None)
 
 
 class FolderMixin(models.Model):
@@ -271,7 +582,7 @@ class PublishInRootFolderMixin(models.Model):
 
     def save(self, *args, **kwargs):
         if (
-            getattr(self, "folder") == Folder.get_root_folder()
+            getattr(self, "folder_id") == Folder.get_root_folder_id()
             and hasattr(self, "is_published")
             and not self.is_published
         ):
@@ -335,17 +646,19 @@ class UserManager(BaseUserManager):
             last_name=extra_fields.get("last_name", ""),
             is_superuser=extra_fields.get("is_superuser", False),
             is_active=extra_fields.get("is_active", True),
-            folder=_get_root_folder(),
+            folder_id=_get_root_folder_id(),
             keep_local_login=extra_fields.get("keep_local_login", False),
         )
-        user.user_groups.set(extra_fields.get("user_groups", []))
         if password:
             user.password = make_password(password)
         else:
             user.set_unusable_password()
         user.save(using=self._db)
+        user_groups = list(extra_fields.get("user_groups", []))
         if initial_group:
-            initial_group.user_set.add(user)
+            user_groups.append(initial_group)
+        if user_groups:
+            user.user_groups.add(*user_groups)
 
         # create an EmailAddress object for the newly created user
         # this is required by allauth
@@ -386,6 +699,87 @@ class UserManager(BaseUserManager):
             **extra_fields,
         )
 
+    @transaction.atomic
+    def bulk_create_users(
+        self, rows: Iterable[dict], batch_size: int = 1000
+    ) -> "list[User]":
+        """
+        Create users in bulk, e.g. for imports or seed data
+        Each row is a dict with an email and optionally a password, first_name, last_name,
+        is_active, keep_local_login and user_groups (instances or ids)
+        Users, email addresses and user groups memberships are inserted in batches,
+        bypassing save() and signals. No welcome mail is sent, and the audit log entries
+        (creation and user groups) are written explicitly, one per user
+        """
+        from auditlog.context import auditlog_disabled
+        from auditlog.diff import model_instance_diff
+        from auditlog.models import LogEntry
+
+        root_folder_id = _get_root_folder_id()
+        sso_settings = _get_sso_settings()
+        sso_forced = sso_settings.get("is_enabled", False) and sso_settings.get(
+            "force_sso", False
+        )
+        users = []
+        memberships = []
+        for row in rows:
+            validate_email(row["email"])
+            user = self.model(
+                email=self.normalize_email(row["email"]),
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", ""),
+                is_active=row.get("is_active", True),
+                folder_id=root_folder_id,
+                keep_local_login=row.get("keep_local_login", False),
+            )
+            # same rule as User.is_local, enforced by User.save
+            is_local = user.is_active and (user.keep_local_login or not sso_forced)
+            if row.get("password") and is_local:
+                user.password = make_password(row["password"])
+            else:
+                user.set_unusable_password()
+            users.append(user)
+            memberships.extend(
+                User.user_groups.through(
+                    user_id=user.id, usergroup_id=getattr(group, "pk", group)
+                )
+                for group in row.get("user_groups", [])
+            )
+        self.bulk_create(users, batch_size=batch_size)
+        EmailAddress.objects.bulk_create(
+            [
+                EmailAddress(user=user, email=user.email, verified=True, primary=True)
+                for user in users
+            ],
+            batch_size=batch_size,
+        )
+        User.user_groups.through.objects.bulk_create(
+            memberships, batch_size=batch_size, ignore_conflicts=True
+        )
+        if not auditlog_disabled.get():
+            groups = UserGroup.objects.in_bulk(
+                {membership.usergroup_id for membership in memberships}
+            )
+            user_groups = defaultdict(list)
+            for membership in memberships:
+                user_groups[membership.user_id].append(groups[membership.usergroup_id])
+            for user in users:
+                LogEntry.objects.log_create(
+                    user,
+                    action=LogEntry.Action.CREATE,
+                    changes=model_instance_diff(
+                        None,
+                        user,
+                        use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES,
+                    ),
+                )
+                LogEntry.objects.log_m2m_changes(
+                    user_groups[user.id], user, "add", "user_groups"
+                )
+        _reset_rbac_request_cache()
+        logger.info("users created sucessfully", count=len(users))
+        return users
+
     def create_superuser(self, email: str, password: str = None, **extra_fields):
         """create a superuser following Django convention"""
         logger.info("creating superuser", email=email)
@@ -503,6 +897,23 @@ class User(AbstractBaseUser, AbstractBaseModel, FolderMixin):
     def mailing(self, email_template_name, subject, object="", object_id="", pk=False):
         """
         Sending a mail to a user for password resetting or creation
+        The mail is sent by the huey worker when ASYNC_MAILING is set, once the
+        current transaction is committed so that the worker can load the user
+        """
+        if settings.ASYNC_MAILING:
+            from iam.tasks import send_user_mail
+
+            args = (self.pk, email_template_name, str(subject), object, object_id, pk)
+            transaction.on_commit(lambda: send_user_mail(*args))
+            logger.info("email queued", recipient=self.email, subject=subject)
+            return
+        self.send_mailing(email_template_name, subject, object, object_id, pk)
+
+    def send_mailing(
+        self, email_template_name, subject, object="", object_id="", pk=False
+    ):
+        """
+        Render and send a mail to the user, falling back to the rescue mailer
         """
         header = {
             "email": self.email,
@@ -573,14 +984,26 @@ class User(AbstractBaseUser, AbstractBaseModel, FolderMixin):
         """get the list of user groups containing the user in the form (group_name, builtin)"""
         return [(x.__str__(), x.builtin) for x in self.user_groups.all()]
 
-    def get_roles(self):
-        """get the list of roles attached to the user"""
+    @cached_property
+    def user_group_ids(self) -> list:
+        """ids of the user groups of the user, cached for the lifetime of the instance
+        and reset when the user groups of the user change"""
+        return list(self.user_groups.values_list("id", flat=True))
+
+    @cached_property
+    def _roles(self) -> list[str]:
+        """roles attached to the user, cached for the lifetime of the instance
+        and reset when the user groups of the user change"""
         return list(
-            self.user_groups.all()
-            .values_list("roleassignment__role__name", flat=True)
-            .distinct()
+            self.user_groups.values_list(
+                "roleassignment__role__name", flat=True
+            ).distinct()
         )
 
+    def get_roles(self):
+        """get the list of roles attached to the user"""
+        return self._roles
+
     @property
     def has_backup_permission(self) -> bool:
         return RoleAssignment.is_access_allowed(
@@ -598,8 +1021,9 @@ class User(AbstractBaseUser, AbstractBaseModel, FolderMixin):
     def username(self):
         return self.email
 
-    @property
+    @cached_property
     def permissions(self):
+        """permissions of the user, cached on the instance"""
         return RoleAssignment.get_permissions(self)
 
     @username.setter
@@ -613,29 +1037,23 @@ class User(AbstractBaseUser, AbstractBaseModel, FolderMixin):
     def is_admin(self) -> bool:
         return self.user_groups.filter(name="BI-UG-ADM").exists()
 
-    @property
+    @cached_property
     def is_editor(self) -> bool:
-        permissions = RoleAssignment.get_permissions(self)
-        editor_prefixes = {"add_", "change_", "delete_"}
-        return any(
-            any(perm.startswith(prefix) for prefix in editor_prefixes)
-            for perm in permissions
-        )
+        """
+        Indicates whether the user has an add, change or delete permission,
+        directly or through one of its user groups. Cached on the instance
+        """
+        return RoleAssignment.objects.filter(
+            Q(user=self) | Q(user_group__user=self),
+            role__permissions__in=_get_editor_permissions(),
+        ).exists()
 
     @property
     def is_local(self) -> bool:
         """
         Indicates whether the user can log in using a local password
         """
-        from global_settings.models import GlobalSettings
-
-        try:
-            sso_settings = GlobalSettings.objects.get(
-                name=GlobalSettings.Names.SSO
-            ).value
-        except GlobalSettings.DoesNotExist:
-            sso_settings = {}
-
+        sso_settings = _get_sso_settings()
         return self.is_active and (
             self.keep_local_login
             or not sso_settings.get("is_enabled", False)
@@ -644,11 +1062,26 @@ class User(AbstractBaseUser, AbstractBaseModel, FolderMixin):
 
     @classmethod
     def get_editors(cls) -> List[Self]:
-        return [
-            user
-            for user in cls.objects.all()
-            if user.is_editor and not user.is_third_party
-        ]
+        editor_assignments = RoleAssignment.objects.filter(
+            role__permissions__in=_get_editor_permissions()
+        )
+        return list(
+            cls.objects.filter(
+                Q(id__in=editor_assignments.values("user"))
+                | Q(user_groups__in=editor_assignments.values("user_group")),
+                is_third_party=False,
+            ).distinct()
+        )
+
+
+@receiver(m2m_changed, sender=User.user_groups.through)
+def reset_user_roles_cache(sender, instance, action, **kwargs):
+    """reset the cached roles of a user when its user groups change"""
+    if isinstance(instance, User) and action.startswith("post_"):
+        instance.__dict__.pop("user_group_ids", None)
+        instance.__dict__.pop("_roles", None)
+        instance.__dict__.pop("is_editor", None)
+        instance.__dict__.pop("permissions", None)
 
 
 class Role(NameDescriptionMixin, FolderMixin):
@@ -673,14 +1106,25 @@ class RoleAssignment(NameDescriptionMixin, FolderMixin):
     perimeter_folders = models.ManyToManyField(
         "Folder", verbose_name=_("Domain"), related_name="perimeter_folders"
     )
+    # user and user_group lead the composite indexes of Meta, no need for their own
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE, db_index=False
+    )
+    user_group = models.ForeignKey(
+        UserGroup, null=True, on_delete=models.CASCADE, db_index=False
     )
-    user_group = models.ForeignKey(UserGroup, null=True, on_delete=models.CASCADE)
     role = models.ForeignKey(Role, on_delete=models.CASCADE, verbose_name=_("Role"))
     is_recursive = models.BooleanField(_("sub folders are visible"), default=False)
     builtin = models.BooleanField(default=False)
 
+    class Meta(NameDescriptionMixin.Meta):
+        """for Model"""
+
+        indexes = [
+            models.Index(fields=["user", "role"]),
+            models.Index(fields=["user_group", "role"]),
+        ]
+
     def __str__(self) -> str:
         # pragma pylint: disable=no-member
         return (
@@ -703,21 +1147,32 @@ class RoleAssignment(NameDescriptionMixin, FolderMixin):
         """
         Determines if a user has specified permission on a specified folder
         """
-        add_tag_permission = Permission.objects.get(codename="add_filteringlabel")
-        for ra in RoleAssignment.get_role_assignments(user):
+        return RoleAssignment._is_access_allowed_by_id(user, perm.id, folder)
+
+    @staticmethod
+    def _is_access_allowed_by_id(
+        user: AbstractBaseUser | AnonymousUser, permission_id: int, folder: Folder
+    ) -> bool:
+        """is_access_allowed for a permission id, e.g. from _get_permission_id"""
+        add_tag_permission_id = _get_permission_id("add_filteringlabel")
+        role_assignments = RoleAssignment.get_role_assignments(user)
+        role_permissions = _get_role_permissions(role_assignments)
+        perimeter_folder_ids = set()
+        for ra in role_assignments:
+            if permission_id not in role_permissions[ra.role_id]:
+                continue
             if (
-                (perm == add_tag_permission) and perm in ra.role.permissions.all()
+                permission_id == add_tag_permission_id
             ):  # Allow any user to add tags if he has the permission
                 return True
-            f = folder
-            while f is not None:
-                if (
-                    f in ra.perimeter_folders.all()
-                    and perm in ra.role.permissions.all()
-                ):
-                    return True
-                f = f.parent_folder
-        return False
+            perimeter_folder_ids.update(f.id for f in ra.perimeter_folders.all())
+        if not perimeter_folder_ids or folder is None:
+            return False
+        if folder.id in perimeter_folder_ids:
+            return True
+        return not perimeter_folder_ids.isdisjoint(
+            Folder.get_parent_folders_ids(folder.id)
+        )
 
     @staticmethod
     def is_object_readable(
@@ -730,9 +1185,8 @@ class RoleAssignment(NameDescriptionMixin, FolderMixin):
         if not obj:
             return False
         class_name = object_type.__name__.lower()
-        permission = Permission.objects.get(codename="view_" + class_name)
-        return RoleAssignment.is_access_allowed(
-            user, permission, Folder.get_folder(obj)
+        return RoleAssignment._is_access_allowed_by_id(
+            user, _get_permission_id("view_" + class_name), Folder.get_folder(obj)
         )
 
     @staticmethod
@@ -747,34 +1201,30 @@ class RoleAssignment(NameDescriptionMixin, FolderMixin):
         Returns the list of the ids of the matching folders
         If permission is specified, returns accessible folders which can be altered with this specific permission
         """
-        folders_set = set()
-        ref_permission = Permission.objects.get(codename=codename)
-        # first get all accessible folders, independently of contentType
-        for ra in [
-            x
-            for x in RoleAssignment.get_role_assignments(user)
-            if (
-                (
-                    Permission.objects.get(codename="view_folder")
-                    in x.role.permissions.all()
-                )
-                and (ref_permission in x.role.permissions.all())
-            )
-        ]:
-            for f in ra.perimeter_folders.all():
-                folders_set.add(f)
-                folders_set.update(f.get_sub_folders())
+        required_permission_ids = {
+            _get_permission_id("view_folder"),
+            _get_permission_id(codename),
+        }
+        role_assignments = RoleAssignment.get_role_assignments(user)
+        role_permissions = _get_role_permissions(role_assignments)
+        # first get all accessible folders ids, independently of contentType
+        # perimeter folders are prefetched by get_role_assignments
+        folders_set = {
+            f.id
+            for ra in role_assignments
+            if required_permission_ids <= role_permissions[ra.role_id]
+            for f in ra.perimeter_folders.all()
+        }
+        folders_set |= Folder.get_sub_folders_bulk(folders_set)
         # calculate perimeter
-        perimeter = set()
-        perimeter.add(folder)
-        perimeter.update(folder.get_sub_folders())
+        perimeter = {folder.id} | Folder.get_sub_folders_bulk([folder.id])
         # return filtered result
-        return [
-            x.id
-            for x in folders_set
-            if (x.content_type == content_type if content_type else True)
-            and x in perimeter
-        ]
+        return list(
+            Folder.objects.filter(
+                id__in=folders_set & perimeter,
+                **({"content_type": content_type} if content_type else {}),
+            ).values_list("id", flat=True)
+        )
 
     @staticmethod
     def get_accessible_object_ids(
@@ -787,139 +1237,285 @@ class RoleAssignment(NameDescriptionMixin, FolderMixin):
         Also retrieve published objects in view
         """
         class_name = object_type.__name__.lower()
-        permission_view = Permission.objects.get(codename="view_" + class_name)
-        permission_change = Permission.objects.get(codename="change_" + class_name)
-        permission_delete = Permission.objects.get(codename="delete_" + class_name)
+        permission_view = _get_permission_id("view_" + class_name)
+        permission_change = _get_permission_id("change_" + class_name)
+        permission_delete = _get_permission_id("delete_" + class_name)
         permissions = set([permission_view, permission_change, permission_delete])
-        result_view = set()
-        result_change = set()
-        result_delete = set()
+        # each object gets a bitmask of the view, change and delete permissions
+        permission_flags = {
+            permission_view: _VIEW_FLAG,
+            permission_change: _CHANGE_FLAG,
+            permission_delete: _DELETE_FLAG,
+        }
+        results = defaultdict(int)
 
-        ref_permission = Permission.objects.get(codename="view_folder")
+        ref_permission = _get_permission_id("view_folder")
         perimeter = {folder} | set(folder.get_sub_folders())
+        perimeter_by_id = {f.id: f for f in perimeter}
         # Process role assignments
-        role_assignments = [
-            ra
-            for ra in RoleAssignment.get_role_assignments(user)
-            if ref_permission in ra.role.permissions.all()
-        ]
+        role_assignments = RoleAssignment.get_role_assignments(user)
+        # subfolders of all the recursive perimeters, in a single query
+        sub_folders = Folder.get_sub_folders_map(
+            {
+                f.id
+                for ra in role_assignments
+                if ra.is_recursive
+                for f in ra.perimeter_folders.all()
+            }
+        )
+        role_permissions = _get_role_permissions(role_assignments)
         result_folders = defaultdict(set)
         for ra in role_assignments:
-            ra_permissions = set(ra.role.permissions.all())
-            ra_perimeter = set(ra.perimeter_folders.all())
+            ra_permissions = role_permissions[ra.role_id]
+            if ref_permission not in ra_permissions:
+                continue
+            ra_perimeter = {f.id for f in ra.perimeter_folders.all()}
             if ra.is_recursive:
                 ra_perimeter.update(
-                    *[folder.get_sub_folders() for folder in ra_perimeter]
+                    *(sub_folders.get(f_id, ()) for f_id in list(ra_perimeter))
                 )
-            target_folders = perimeter & ra_perimeter
+            target_folders = [
+                perimeter_by_id[f_id] for f_id in perimeter_by_id.keys() & ra_perimeter
+            ]
             for p in permissions & ra_permissions:
                 for f in target_folders:
                     result_folders[f].add(p)
-        for f in result_folders:
-            if hasattr(object_type, "folder"):
-                objects_ids = object_type.objects.filter(folder=f).values_list(
-                    "id", flat=True
-                )
-            elif hasattr(object_type, "risk_assessment"):
-                objects_ids = object_type.objects.filter(
-                    risk_assessment__folder=f
-                ).values_list("id", flat=True)
-            elif hasattr(object_type, "entity"):
-                objects_ids = object_type.objects.filter(entity__folder=f).values_list(
-                    "id", flat=True
-                )
-            elif hasattr(object_type, "provider_entity"):
-                objects_ids = object_type.objects.filter(
-                    provider_entity__folder=f
-                ).values_list("id", flat=True)
-            elif hasattr(object_type, "parent_folder"):
-                objects_ids = [f.id]
-            else:
-                raise NotImplementedError("type not supported")
-            if permission_view in result_folders[f]:
-                result_view.update(objects_ids)
-            if permission_change in result_folders[f]:
-                result_change.update(objects_ids)
-            if permission_delete in result_folders[f]:
-                result_delete.update(objects_ids)
-
-        if hasattr(object_type, "is_published") and hasattr(object_type, "folder"):
+        folder_flags = {}
+        for f, perms in result_folders.items():
+            flags = 0
+            for p in perms:
+                flags |= permission_flags[p]
+            folder_flags[f.id] = flags
+        folder_lookup, is_supported, is_publishable = (
+            RoleAssignment._get_object_type_folder_info(object_type)
+        )
+        if not folder_flags:
+            rows = []
+        elif not is_supported:
+            raise NotImplementedError("type not supported")
+        elif folder_lookup is None:
+            rows = [(f_id, f_id) for f_id in folder_flags]
+        else:
+            rows = object_type.objects.filter(
+                **{f"{folder_lookup}__in": folder_flags}
+            ).values_list("id", folder_lookup)
+        for object_id, folder_id in rows:
+            results[object_id] |= folder_flags[folder_id]
+
+        if is_publishable:
             # we assume only objects with a folder attribute are worth publishing
             folders_with_local_view = [
-                f for f in result_folders if permission_view in result_folders[f]
+                f
+                for f, perms in result_folders.items()
+                if permission_view in perms
+                and f.content_type != Folder.ContentType.ENCLAVE
             ]
-            for my_folder in folders_with_local_view:
-                if my_folder.content_type != Folder.ContentType.ENCLAVE:
-                    my_folder2 = my_folder.parent_folder
-                    while my_folder2:
-                        result_view.update(
-                            object_type.objects.filter(
-                                folder=my_folder2, is_published=True
-                            ).values_list("id", flat=True)
-                        )
-                        my_folder2 = my_folder2.parent_folder
-
-        return (list(result_view), list(result_change), list(result_delete))
+            parent_ids = {
+                f.parent_folder_id
+                for f in folders_with_local_view
+                if f.parent_folder_id is not None
+            }
+            if parent_ids:
+                # the ancestors of all these folders are resolved in the same query
+                query, params = Folder._parent_folders_cte(parent_ids)
+                for object_id in object_type.objects.filter(
+                    folder_id__in=RawSQL(
+                        query + "SELECT id FROM parent_folders", params
+                    ),
+                    is_published=True,
+                ).values_list("id", flat=True):
+                    results[object_id] |= _VIEW_FLAG
+
+        return (
+            [o for o, flags in results.items() if flags & _VIEW_FLAG],
+            [o for o, flags in results.items() if flags & _CHANGE_FLAG],
+            [o for o, flags in results.items() if flags & _DELETE_FLAG],
+        )
+
+    @staticmethod
+    def _get_object_type_folder_info(object_type: Any) -> tuple[str | None, bool, bool]:
+        """
+        Return the lookup from an object type to its folder (None for folders),
+        whether the type is supported and whether its objects can be published.
+        It is computed once per object type.
+        """
+        info = _OBJECT_TYPE_FOLDER_INFO.get(object_type)
+        if info is None:
+            folder_lookup, is_supported = None, False
+            for attribute, lookup in _OBJECT_FOLDER_LOOKUPS:
+                if hasattr(object_type, attribute):
+                    folder_lookup, is_supported = lookup, True
+                    break
+            is_publishable = hasattr(object_type, "is_published") and hasattr(
+                object_type, "folder"
+            )
+            info = (folder_lookup, is_supported, is_publishable)
+            _OBJECT_TYPE_FOLDER_INFO[object_type] = info
+        return info
 
     def is_user_assigned(self, user) -> bool:
         """Determines if a user is assigned to the role assignment"""
-        return user == self.user or (
-            self.user_group and self.user_group in user.user_groups.all()
+        if self.user_id is not None and self.user_id == user.pk:
+            return True
+        return (
+            self.user_group_id is not None and self.user_group_id in user.user_group_ids
         )
 
     @staticmethod
+    @_cached_per_request
     def get_role_assignments(principal: AbstractBaseUser | AnonymousUser | UserGroup):
-        """get all role assignments attached to a user directly or indirectly"""
-        assignments = list(principal.roleassignment_set.all())
+        """
+        get all role assignments attached to a user directly or indirectly
+        Their role permissions and perimeter folders are prefetched
+        """
+        return list(
+            RoleAssignment._get_role_assignments_queryset(principal)
+            .select_related("role")
+            .prefetch_related("role__permissions", "perimeter_folders")
+        )
+
+    @staticmethod
+    def _get_role_assignments_queryset(
+        principal: AbstractBaseUser | AnonymousUser | UserGroup,
+    ) -> models.QuerySet:
+        """queryset of the role assignments attached to a user directly or indirectly"""
+        if isinstance(principal, AnonymousUser):
+            return RoleAssignment.objects.none()
         if hasattr(principal, "user_groups"):
-            for user_group in principal.user_groups.all():
-                assignments += list(user_group.roleassignment_set.all())
-        assignments += list(principal.roleassignment_set.all())
-        return assignments
+            return RoleAssignment.objects.filter(
+                Q(user=principal) | Q(user_group__in=principal.user_group_ids)
+            )
+        return principal.roleassignment_set.all()
 
     @staticmethod
+    @_cached_per_request
     def get_permissions(principal: AbstractBaseUser | AnonymousUser | UserGroup):
-        """get all permissions attached to a user directly or indirectly"""
-        permissions = {}
-        for ra in RoleAssignment.get_role_assignments(principal):
-            for p in ra.role.permissions.all():
-                permission_dict = {p.codename: {"str": str(p)}}
-                permissions.update(permission_dict)
-
-        return permissions
+        """
+        get all permissions attached to a user directly or indirectly
+        The distinct permissions come from a single query, their labels are memoized
+        """
+        permissions = (
+            Permission.objects.filter(
+                role__in=RoleAssignment._get_role_assignments_queryset(
+                    principal
+                ).values("role_id")
+            )
+            .values_list(
+                "codename", "content_type__app_label", "content_type__model", "name"
+            )
+            .distinct()
+        )
+        language = get_language()
+        return {
+            codename: {"str": _get_permission_label(app_label, model, name, language)}
+            for codename, app_label, model, name in permissions
+        }
 
     @staticmethod
     def has_role(user: AbstractBaseUser | AnonymousUser, role: Role):
         """
         Determines if a user has a specific role.
         """
-        for ra in RoleAssignment.get_role_assignments(user):
-            if ra.role == role:
-                return True
-        return False
+        if not user.is_authenticated:
+            return False
+        return RoleAssignment.objects.filter(
+            Q(user=user) | Q(user_group__in=user.user_group_ids), role=role
+        ).exists()
 
-    @classmethod
+    @staticmethod
+    def has_permission_in_folder(
+        principal: AbstractBaseUser | AnonymousUser | UserGroup,
+        folder: Folder,
+        codename: str,
+    ) -> bool:
+        """
+        Determines if a principal has a permission on a folder, either through a role
+        assignment on the folder itself or a recursive one on one of its parents.
+        Within a request, the cached permissions per folder are reused so that repeated
+        checks are memory lookups; otherwise, nothing else than this pair is computed.
+        """
+        if folder is None:
+            return False
+        if getattr(_request_cache, "store", None) is not None:
+            return codename in RoleAssignment.get_permissions_per_folder(
+                principal=principal, recursive=True
+            ).get(folder.id, ())
+        return (
+            RoleAssignment._get_role_assignments_queryset(principal)
+            .filter(
+                Q(perimeter_folders=folder)
+                | Q(
+                    is_recursive=True,
+                    perimeter_folders__in=Folder.get_parent_folders_ids(folder.id),
+                ),
+                role__permissions__codename=codename,
+            )
+            .exists()
+        )
+
+    @staticmethod
+    @_cached_per_request
     def get_permissions_per_folder(
-        cls, principal: AbstractBaseUser | AnonymousUser | UserGroup, recursive=False
+        principal: AbstractBaseUser | AnonymousUser | UserGroup, recursive=False
     ):
         """
-        Get all permissions attached to a user directly or indirectly, grouped by folder.
+        Get all permissions attached to a user directly or indirectly, grouped by folder id.
         If recursive is set to True, permissions from recursive role assignments are transmitted
         to the children of its perimeter folders.
         """
-        permissions = defaultdict(set)
-        for ra in cls.get_role_assignments(principal):
-            ra_permissions = set(
-                ra.role.permissions.all().values_list("codename", flat=True)
+        # only ids and codenames are needed, so no model instance is built
+        # the perimeter folders come with the role assignments, one row per folder
+        rows = RoleAssignment._get_role_assignments_queryset(principal).values_list(
+            "id", "role_id", "is_recursive", "perimeter_folders"
+        )
+        role_assignments = {}
+        perimeters = defaultdict(set)
+        for ra_id, role_id, is_recursive, folder_id in rows:
+            role_assignments[ra_id] = (role_id, is_recursive)
+            if folder_id is not None:
+                perimeters[ra_id].add(folder_id)
+        role_permissions = defaultdict(set)
+        for role_id, codename in Role.permissions.through.objects.filter(
+            role_id__in={role_id for role_id, _recursive in role_assignments.values()}
+        ).values_list("role_id", "permission__codename"):
+            role_permissions[role_id].add(codename)
+        # subfolders of all the recursive perimeters, in a single query
+        sub_folders = (
+            Folder.get_sub_folders_map(
+                {
+                    folder_id
+                    for ra_id, (_role_id, is_recursive) in role_assignments.items()
+                    if is_recursive
+                    for folder_id in perimeters[ra_id]
+                }
             )
-            for folder in ra.perimeter_folders.all():
-                permissions[str(folder.id)] |= ra_permissions
-                if recursive and ra.is_recursive:
-                    for f in folder.get_sub_folders():
-                        permissions[str(f.id)] |= ra_permissions
+            if recursive
+            else {}
+        )
+        permissions = defaultdict(set)
+        for ra_id, (role_id, is_recursive) in role_assignments.items():
+            folder_ids = set(perimeters[ra_id])
+            if recursive and is_recursive:
+                folder_ids.update(
+                    *(sub_folders.get(f_id, ()) for f_id in perimeters[ra_id])
+                )
+            for folder_id in folder_ids:
+                permissions[folder_id] |= role_permissions[role_id]
         return permissions
 
 
+@receiver([post_save, post_delete], sender=Folder)
+@receiver([post_save, post_delete], sender=UserGroup)
+@receiver([post_save, post_delete], sender=Role)
+@receiver([post_save, post_delete], sender=RoleAssignment)
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(m2m_changed, sender=RoleAssignment.perimeter_folders.through)
+@receiver(m2m_changed, sender=User.user_groups.through)
+def reset_rbac_request_cache(sender, **kwargs):
+    """reset the RBAC values cached for the current request on any RBAC change"""
+    _reset_rbac_request_cache()
+
+
 class PersonalAccessToken(models.Model):
     """
     Personal Access Token model.
@@ -0,0 +1,19 @@
+from huey.contrib.djhuey import db_task
+
+from iam.models import User
+
+import structlog
+
+logger = structlog.getLogger(__name__)
+
+
+@db_task()
+def send_user_mail(
+    user_id, email_template_name, subject, object="", object_id="", pk=False
+):
+    """send a mail queued by User.mailing"""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        logger.warning("mail recipient not found", user_id=user_id)
+        return
+    user.send_mailing(email_template_name, subject, object, object_id, pk)
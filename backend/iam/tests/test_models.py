@@ -4,6 +4,7 @@ from core.models import *
 from iam.models import *
 from library.utils import *
 import pytest
+from types import SimpleNamespace
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -38,3 +39,557 @@ class TestFolder:
         assert folder2.content_type == Folder.ContentType.DOMAIN
         assert folder1.parent_folder == root_folder
         assert folder2.parent_folder == parent_folder
+
+    def test_root_folder_id_is_cached_per_request(self, django_assert_num_queries):
+        from iam.models import _request_cache
+
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        _request_cache.store = {}
+        try:
+            assert Folder.get_root_folder_id() == root_folder.id
+            with django_assert_num_queries(0):
+                assert Folder.get_root_folder_id() == root_folder.id
+
+            root_folder.save()
+            with django_assert_num_queries(1):
+                assert Folder.get_root_folder_id() == root_folder.id
+        finally:
+            del _request_cache.store
+        # without a request, nothing is cached at process level, so other workers
+        # never keep a stale id, e.g. after a backup restore
+        with django_assert_num_queries(1):
+            assert Folder.get_root_folder_id() == root_folder.id
+
+    def test_create_default_ug_and_ra(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        folder = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        Folder.create_default_ug_and_ra(folder)
+
+        user_groups = UserGroup.objects.filter(folder=folder)
+        assert set(user_groups.values_list("name", flat=True)) == {
+            "BI-UG-AUD",
+            "BI-UG-APP",
+            "BI-UG-ANA",
+            "BI-UG-DMA",
+        }
+        for user_group in user_groups:
+            role_assignment = RoleAssignment.objects.get(user_group=user_group)
+            assert role_assignment.role.name == user_group.name.replace("UG", "RL")
+            assert list(role_assignment.perimeter_folders.all()) == [folder]
+            assert role_assignment.folder == root_folder
+            assert role_assignment.is_recursive
+            assert role_assignment.builtin
+
+    def test_get_sub_folders(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        sub_sub_domain = Folder.objects.create(
+            name="Sub sub domain", parent_folder=sub_domain
+        )
+        other_domain = Folder.objects.create(name="Other", parent_folder=root_folder)
+
+        assert set(domain.get_sub_folders()) == {sub_domain, sub_sub_domain}
+        assert set(sub_sub_domain.get_sub_folders()) == set()
+        assert Folder.get_sub_folders_bulk([sub_domain.id, other_domain.id]) == {
+            sub_sub_domain.id
+        }
+        assert Folder.get_sub_folders_map(
+            [domain.id, sub_domain.id, other_domain.id]
+        ) == {
+            domain.id: {sub_domain.id, sub_sub_domain.id},
+            sub_domain.id: {sub_sub_domain.id},
+        }
+        assert Folder.get_sub_folders_bulk([]) == set()
+
+    def test_get_folder(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        folder = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        perimeter = Perimeter.objects.create(name="perimeter", folder=folder)
+        control = AppliedControl.objects.create(name="control", folder=folder)
+
+        assert Folder.get_folder(folder) == folder
+        assert Folder.get_folder(perimeter) == folder
+        assert Folder.get_folder(control) == folder
+        assert Folder.get_folder({"perimeter": {"folder": folder}}) == folder
+        assert Folder.get_folder({"name": "no folder"}) is None
+        assert Folder.get_folder(SimpleNamespace(perimeter=perimeter)) == folder
+        assert (
+            Folder.get_folder(SimpleNamespace(perimeter={"folder": folder})) == folder
+        )
+        assert Folder.get_folder(SimpleNamespace(perimeter=None)) is None
+
+    def test_get_parent_folders(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+
+        assert list(sub_domain.get_parent_folders()) == [domain, root_folder]
+        assert list(root_folder.get_parent_folders()) == []
+        assert Folder.get_parent_folders_ids(sub_domain.id) == [
+            domain.id,
+            root_folder.id,
+        ]
+        assert sub_domain.get_folder_full_path() == [domain, sub_domain]
+        assert sub_domain.get_folder_full_path(include_root=True) == [
+            root_folder,
+            domain,
+            sub_domain,
+        ]
+
+    def test_get_folder_full_path_runs_a_single_query(self, django_assert_num_queries):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        AppliedControl.objects.create(name="control", folder=domain)
+        AppliedControl.objects.create(name="sub control", folder=sub_domain)
+
+        for name, path in (
+            ("control", [domain]),
+            ("sub control", [domain, sub_domain]),
+        ):
+            control = AppliedControl.objects.select_related("folder").get(name=name)
+            with django_assert_num_queries(1):
+                assert control.get_folder_full_path() == path
+
+
+@pytest.mark.django_db
+class TestRoleAssignment:
+    pytestmark = pytest.mark.django_db
+
+    def test_is_access_allowed_walks_up_the_folder_tree(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        other_domain = Folder.objects.create(name="Other", parent_folder=root_folder)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(domain)
+
+        view_folder = Permission.objects.get(codename="view_folder")
+        change_folder = Permission.objects.get(codename="change_folder")
+        assert RoleAssignment.is_access_allowed(user, view_folder, domain)
+        assert RoleAssignment.is_access_allowed(user, view_folder, sub_domain)
+        assert not RoleAssignment.is_access_allowed(user, view_folder, other_domain)
+        assert not RoleAssignment.is_access_allowed(user, view_folder, root_folder)
+        assert not RoleAssignment.is_access_allowed(user, change_folder, domain)
+
+    def test_is_object_readable(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        other_domain = Folder.objects.create(name="Other", parent_folder=root_folder)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_appliedcontrol"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain
+        )
+        role_assignment.perimeter_folders.add(domain)
+        control = AppliedControl.objects.create(name="control", folder=domain)
+        other = AppliedControl.objects.create(name="other", folder=other_domain)
+
+        assert RoleAssignment.is_object_readable(user, AppliedControl, control.id)
+        assert not RoleAssignment.is_object_readable(user, AppliedControl, other.id)
+        assert not RoleAssignment.is_object_readable(user, AppliedControl, uuid.uuid4())
+
+    def test_is_access_allowed_only_walks_the_ancestors(
+        self, django_assert_num_queries
+    ):
+        from iam.models import _request_cache
+
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(domain)
+        view_folder = Permission.objects.get(codename="view_folder")
+
+        _request_cache.store = {}
+        try:
+            assert RoleAssignment.is_access_allowed(user, view_folder, domain)
+            # a single recursive query on the ancestors of the folder
+            with django_assert_num_queries(1) as captured:
+                assert RoleAssignment.is_access_allowed(user, view_folder, sub_domain)
+            assert "RECURSIVE" in captured.captured_queries[0]["sql"]
+        finally:
+            del _request_cache.store
+
+    def test_get_accessible_object_ids(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        other_domain = Folder.objects.create(name="Other", parent_folder=root_folder)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(
+            Permission.objects.filter(
+                codename__in=["view_folder", "view_appliedcontrol"]
+            )
+        )
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(domain)
+        control = AppliedControl.objects.create(name="control", folder=domain)
+        sub_control = AppliedControl.objects.create(name="control", folder=sub_domain)
+        AppliedControl.objects.create(name="control", folder=other_domain)
+
+        view, change, delete = RoleAssignment.get_accessible_object_ids(
+            root_folder, user, AppliedControl
+        )
+        assert set(view) == {control.id, sub_control.id}
+        assert change == []
+        assert delete == []
+
+        editor = Role.objects.create(name="test editor")
+        editor.permissions.set(
+            Permission.objects.filter(
+                codename__in=["view_folder", "change_appliedcontrol"]
+            )
+        )
+        editor_assignment = RoleAssignment.objects.create(
+            user=user, role=editor, folder=sub_domain
+        )
+        editor_assignment.perimeter_folders.add(sub_domain)
+        view, change, delete = RoleAssignment.get_accessible_object_ids(
+            root_folder, user, AppliedControl
+        )
+        assert set(view) == {control.id, sub_control.id}
+        assert change == [sub_control.id]
+        assert delete == []
+
+    def test_get_accessible_folders(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        Folder.objects.create(name="Other", parent_folder=root_folder)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(domain)
+
+        assert set(RoleAssignment.get_accessible_folders(root_folder, user, None)) == {
+            domain.id,
+            sub_domain.id,
+        }
+        assert RoleAssignment.get_accessible_folders(
+            sub_domain, user, Folder.ContentType.DOMAIN
+        ) == [sub_domain.id]
+        assert (
+            RoleAssignment.get_accessible_folders(
+                root_folder, user, None, codename="change_folder"
+            )
+            == []
+        )
+
+    def test_get_permissions_per_folder(self, django_assert_num_queries):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(domain)
+
+        assert RoleAssignment.get_permissions_per_folder(user) == {
+            domain.id: {"view_folder"}
+        }
+        assert RoleAssignment.get_permissions_per_folder(user, recursive=True) == {
+            domain.id: {"view_folder"},
+            sub_domain.id: {"view_folder"},
+        }
+        # role assignments with their perimeter folders, then role permissions
+        with django_assert_num_queries(2):
+            RoleAssignment.get_permissions_per_folder(user)
+
+    def test_is_user_assigned(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        Folder.create_default_ug_and_ra(domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        other_user = User.objects.create_user(
+            email="other@example.com", password="password"
+        )
+        user_group = UserGroup.objects.get(folder=domain, name="BI-UG-ANA")
+        user.user_groups.add(user_group)
+        group_assignment = RoleAssignment.objects.get(user_group=user_group)
+        direct_assignment = RoleAssignment.objects.create(
+            user=other_user, role=Role.objects.get(name="BI-RL-AUD"), folder=domain
+        )
+
+        assert group_assignment.is_user_assigned(user)
+        assert not group_assignment.is_user_assigned(other_user)
+        assert direct_assignment.is_user_assigned(other_user)
+        assert not direct_assignment.is_user_assigned(user)
+
+    def test_has_permission_in_folder(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        other_domain = Folder.objects.create(name="Other", parent_folder=root_folder)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain
+        )
+        role_assignment.perimeter_folders.add(domain)
+
+        assert RoleAssignment.has_permission_in_folder(user, domain, "view_folder")
+        assert not RoleAssignment.has_permission_in_folder(
+            user, domain, "change_folder"
+        )
+        assert not RoleAssignment.has_permission_in_folder(
+            user, sub_domain, "view_folder"
+        )
+        assert not RoleAssignment.has_permission_in_folder(
+            user, other_domain, "view_folder"
+        )
+
+        role_assignment.is_recursive = True
+        role_assignment.save()
+        assert RoleAssignment.has_permission_in_folder(user, sub_domain, "view_folder")
+        assert not RoleAssignment.has_permission_in_folder(
+            user, root_folder, "view_folder"
+        )
+
+    def test_has_permission_in_folder_uses_request_cache(
+        self, django_assert_num_queries
+    ):
+        from iam.models import _request_cache
+
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(domain)
+
+        _request_cache.store = {}
+        try:
+            assert RoleAssignment.has_permission_in_folder(user, domain, "view_folder")
+            with django_assert_num_queries(0):
+                assert RoleAssignment.has_permission_in_folder(
+                    user, sub_domain, "view_folder"
+                )
+                assert not RoleAssignment.has_permission_in_folder(
+                    user, root_folder, "view_folder"
+                )
+                assert not RoleAssignment.has_permission_in_folder(
+                    user, domain, "change_folder"
+                )
+
+            role.permissions.add(Permission.objects.get(codename="change_folder"))
+            assert RoleAssignment.has_permission_in_folder(
+                user, sub_domain, "change_folder"
+            )
+        finally:
+            del _request_cache.store
+
+    def test_get_role_assignments_has_no_duplicates(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        Folder.create_default_ug_and_ra(domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        user_group = UserGroup.objects.get(folder=domain, name="BI-UG-ANA")
+        user.user_groups.add(user_group)
+        role = Role.objects.create(name="test reader")
+        direct_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain
+        )
+
+        role_assignments = RoleAssignment.get_role_assignments(user)
+        assert len(role_assignments) == len(set(role_assignments)) == 2
+        assert set(role_assignments) == {
+            direct_assignment,
+            RoleAssignment.objects.get(user_group=user_group),
+        }
+        assert RoleAssignment.get_role_assignments(user_group) == [
+            RoleAssignment.objects.get(user_group=user_group)
+        ]
+
+    def test_has_role(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        Folder.create_default_ug_and_ra(domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        analyst = Role.objects.get(name="BI-RL-ANA")
+        reader = Role.objects.get(name="BI-RL-AUD")
+        assert not RoleAssignment.has_role(user, analyst)
+        assert not RoleAssignment.has_role(AnonymousUser(), analyst)
+
+        user.user_groups.add(UserGroup.objects.get(folder=domain, name="BI-UG-ANA"))
+        assert RoleAssignment.has_role(user, analyst)
+        assert not RoleAssignment.has_role(user, reader)
+
+    def test_get_permissions(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        Folder.create_default_ug_and_ra(domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        user.user_groups.add(UserGroup.objects.get(folder=domain, name="BI-UG-ANA"))
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        RoleAssignment.objects.create(user=user, role=role, folder=domain)
+
+        analyst_permissions = Role.objects.get(name="BI-RL-ANA").permissions.all()
+        assert RoleAssignment.get_permissions(user) == {
+            p.codename: {"str": str(p)}
+            for p in [
+                *analyst_permissions,
+                Permission.objects.get(codename="view_folder"),
+            ]
+        }
+        assert RoleAssignment.get_permissions(AnonymousUser()) == {}
+
+    def test_get_permissions_labels_are_memoized(self, django_assert_num_queries):
+        from iam.models import _get_permission_label
+
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        Folder.create_default_ug_and_ra(domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        user.user_groups.add(UserGroup.objects.get(folder=domain, name="BI-UG-ANA"))
+        permissions = RoleAssignment.get_permissions(user)
+
+        assert permissions["view_folder"] == {
+            "str": str(Permission.objects.get(codename="view_folder"))
+        }
+
+        # labels are not rebuilt, only the permissions of the user are queried
+        misses = _get_permission_label.cache_info().misses
+        with django_assert_num_queries(1):
+            assert RoleAssignment.get_permissions(user) == permissions
+        assert _get_permission_label.cache_info().misses == misses
+
+    def test_permission_ids_are_cached_per_request_only(
+        self, django_assert_num_queries
+    ):
+        from iam.models import _get_permission_id, _request_cache
+
+        permission_id = Permission.objects.get(codename="view_folder").id
+        assert _get_permission_id("view_folder") == permission_id
+        # no process-wide cache, permission ids may change on a backup restore
+        with django_assert_num_queries(1):
+            assert _get_permission_id("view_folder") == permission_id
+
+        _request_cache.store = {}
+        try:
+            assert _get_permission_id("view_folder") == permission_id
+            with django_assert_num_queries(0):
+                assert _get_permission_id("view_folder") == permission_id
+        finally:
+            del _request_cache.store
+
+    def test_permissions_are_cached_per_request(self, django_assert_num_queries):
+        from iam.models import _request_cache
+
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(Permission.objects.filter(codename="view_folder"))
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=domain
+        )
+        role_assignment.perimeter_folders.add(domain)
+
+        _request_cache.store = {}
+        try:
+            assert set(RoleAssignment.get_permissions(user)) == {"view_folder"}
+            RoleAssignment.get_role_assignments(user)
+            with django_assert_num_queries(0):
+                assert set(RoleAssignment.get_permissions(user)) == {"view_folder"}
+                RoleAssignment.get_role_assignments(user)
+
+            role.permissions.add(Permission.objects.get(codename="change_folder"))
+            assert set(RoleAssignment.get_permissions(user)) == {
+                "view_folder",
+                "change_folder",
+            }
+        finally:
+            del _request_cache.store
+
+    def test_get_accessible_object_ids_includes_published_parent_objects(self):
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        sub_domain = Folder.objects.create(name="Sub domain", parent_folder=domain)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(
+            Permission.objects.filter(
+                codename__in=["view_folder", "view_appliedcontrol"]
+            )
+        )
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=sub_domain
+        )
+        role_assignment.perimeter_folders.add(sub_domain)
+        control = AppliedControl.objects.create(name="control", folder=sub_domain)
+        published = AppliedControl.objects.create(
+            name="published", folder=domain, is_published=True
+        )
+        AppliedControl.objects.create(
+            name="unpublished", folder=domain, is_published=False
+        )
+        root_published = AppliedControl.objects.create(
+            name="root published", folder=root_folder, is_published=True
+        )
+
+        view, change, delete = RoleAssignment.get_accessible_object_ids(
+            root_folder, user, AppliedControl
+        )
+        assert set(view) == {control.id, published.id, root_published.id}
+
+    def test_get_accessible_object_ids_query_count_does_not_grow_with_folders(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        root_folder = Folder.objects.get(content_type=Folder.ContentType.ROOT)
+        user = User.objects.create_user(email="user@example.com", password="password")
+        role = Role.objects.create(name="test reader")
+        role.permissions.set(
+            Permission.objects.filter(
+                codename__in=["view_folder", "view_appliedcontrol"]
+            )
+        )
+        role_assignment = RoleAssignment.objects.create(
+            user=user, role=role, folder=root_folder, is_recursive=True
+        )
+        role_assignment.perimeter_folders.add(root_folder)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                RoleAssignment.get_accessible_object_ids(
+                    root_folder, user, AppliedControl
+                )
+            return len(context.captured_queries)
+
+        domain = Folder.objects.create(name="Domain", parent_folder=root_folder)
+        AppliedControl.objects.create(name="control", folder=domain)
+        # the user group ids are cached on the user by the first call
+        count_queries()
+        queries = count_queries()
+        for i in range(3):
+            domain = Folder.objects.create(name=f"Domain {i}", parent_folder=domain)
+            AppliedControl.objects.create(name="control", folder=domain)
+        assert count_queries() == queries
@@ -2,7 +2,7 @@ import pytest
 from django.contrib.auth.models import Permission
 
 from core.tests.fixtures import *
-from iam.models import Folder, Role, RoleAssignment, User
+from iam.models import Folder, Role, RoleAssignment, User, UserGroup
 
 
 @pytest.mark.django_db
@@ -114,3 +114,146 @@ class TestUser:
         editors = User.get_editors()
         assert len(editors) == 1
         assert user in editors
+
+    @pytest.mark.usefixtures("domain_perimeter_fixture")
+    def test_user_group_member_is_editor(self):
+        user = User.objects.create_user(email="root@example.com", password="password")
+        third_party = User.objects.create_user(
+            email="third@example.com", password="password"
+        )
+        third_party.is_third_party = True
+        third_party.save()
+        assert user is not None
+
+        folder = Folder.objects.filter(content_type=Folder.ContentType.DOMAIN).last()
+        Folder.create_default_ug_and_ra(folder)
+        analysts = UserGroup.objects.get(folder=folder, name="BI-UG-ANA")
+        analysts.user_set.add(user, third_party)
+
+        assert user.is_editor
+
+        editors = User.get_editors()
+        assert len(editors) == 1
+        assert user in editors
+
+    @pytest.mark.usefixtures("domain_perimeter_fixture")
+    def test_cached_roles_are_reset_on_user_groups_change(self):
+        user = User.objects.create_user(email="root@example.com", password="password")
+        folder = Folder.objects.filter(content_type=Folder.ContentType.DOMAIN).last()
+        Folder.create_default_ug_and_ra(folder)
+        assert user.get_roles() == []
+
+        assert not user.is_editor
+        assert user.permissions == {}
+        assert user.user_group_ids == []
+
+        user_group = UserGroup.objects.get(folder=folder, name="BI-UG-ANA")
+        user.user_groups.add(user_group)
+        assert user.user_group_ids == [user_group.id]
+        assert user.get_roles() == ["BI-RL-ANA"]
+        assert user.is_editor
+        assert "add_appliedcontrol" in user.permissions
+
+    @pytest.mark.usefixtures("domain_perimeter_fixture")
+    def test_create_user_with_user_groups(self):
+        folder = Folder.objects.filter(content_type=Folder.ContentType.DOMAIN).last()
+        Folder.create_default_ug_and_ra(folder)
+        user_groups = UserGroup.objects.filter(folder=folder)[:2]
+        user = User.objects.create_user(
+            email="root@example.com", password="password", user_groups=user_groups
+        )
+        assert set(user.user_groups.all()) == set(user_groups)
+
+    def test_sso_settings_are_cached_per_request(self, django_assert_num_queries):
+        from global_settings.models import GlobalSettings
+        from iam.models import _request_cache
+
+        user = User.objects.create_user(email="root@example.com", password="password")
+        sso_settings, _created = GlobalSettings.objects.get_or_create(
+            name=GlobalSettings.Names.SSO, defaults={"value": {}}
+        )
+        _request_cache.store = {}
+        try:
+            with django_assert_num_queries(1):
+                assert user.is_local
+                assert user.is_local
+
+            sso_settings.value = {"is_enabled": True, "force_sso": True}
+            sso_settings.save()
+            assert not user.is_local
+        finally:
+            del _request_cache.store
+
+    def test_mailing_is_queued_when_async(
+        self, settings, django_capture_on_commit_callbacks
+    ):
+        from unittest.mock import patch
+
+        user = User.objects.create_user(email="root@example.com", password="password")
+        settings.ASYNC_MAILING = True
+        with (
+            patch("iam.tasks.send_user_mail") as send_user_mail,
+            patch.object(User, "send_mailing") as send_mailing,
+        ):
+            with django_capture_on_commit_callbacks(execute=True):
+                user.mailing(
+                    email_template_name="registration/password_reset_email.html",
+                    subject="subject",
+                )
+                # the task is only queued once the transaction is committed
+                send_user_mail.assert_not_called()
+        send_user_mail.assert_called_once_with(
+            user.pk, "registration/password_reset_email.html", "subject", "", "", False
+        )
+        send_mailing.assert_not_called()
+
+    @pytest.mark.usefixtures("domain_perimeter_fixture")
+    def test_bulk_create_users(self):
+        from allauth.account.models import EmailAddress
+
+        folder = Folder.objects.filter(content_type=Folder.ContentType.DOMAIN).last()
+        Folder.create_default_ug_and_ra(folder)
+        analysts = UserGroup.objects.get(folder=folder, name="BI-UG-ANA")
+        users = User.objects.bulk_create_users(
+            [
+                {"email": "first@example.com", "password": "password"},
+                {
+                    "email": "second@example.com",
+                    "first_name": "Second",
+                    "user_groups": [analysts],
+                },
+            ]
+        )
+
+        assert len(users) == 2
+        first = User.objects.get(email="first@example.com")
+        second = User.objects.get(email="second@example.com")
+        assert first.check_password("password")
+        assert not second.has_usable_password()
+        assert second.first_name == "Second"
+        assert first.folder_id == Folder.get_root_folder_id()
+        assert list(second.user_groups.all()) == [analysts]
+        assert EmailAddress.objects.filter(user__in=users, verified=True).count() == 2
+
+    @pytest.mark.usefixtures("domain_perimeter_fixture")
+    def test_bulk_create_users_is_audited(self):
+        from auditlog.models import LogEntry
+
+        folder = Folder.objects.filter(content_type=Folder.ContentType.DOMAIN).last()
+        Folder.create_default_ug_and_ra(folder)
+        analysts = UserGroup.objects.get(folder=folder, name="BI-UG-ANA")
+        first, second = User.objects.bulk_create_users(
+            [
+                {"email": "first@example.com", "password": "password"},
+                {"email": "second@example.com", "user_groups": [analysts]},
+            ]
+        )
+
+        create, update = LogEntry.Action.CREATE, LogEntry.Action.UPDATE
+        assert LogEntry.objects.get_for_object(first).filter(action=create).exists()
+        assert not LogEntry.objects.get_for_object(first).filter(action=update).exists()
+        entry = LogEntry.objects.get_for_object(second).get(action=create)
+        assert entry.changes_dict["email"] == ["None", "second@example.com"]
+        assert "password" not in entry.changes_dict
+        membership = LogEntry.objects.get_for_object(second).get(action=update)
+        assert membership.changes_dict["user_groups"]["objects"] == [str(analysts)]
@@ -220,10 +220,13 @@ class CurrentUserView(views.APIView):
             "is_admin": request.user.is_admin(),
             "is_local": request.user.is_local,
             "accessible_domains": [str(f) for f in accessible_domains],
-            "domain_permissions": RoleAssignment.get_permissions_per_folder(
-                principal=request.user, recursive=True
-            ),
-            "root_folder_id": Folder.get_root_folder().id,
+            "domain_permissions": {
+                str(folder_id): permissions
+                for folder_id, permissions in RoleAssignment.get_permissions_per_folder(
+                    principal=request.user, recursive=True
+                ).items()
+            },
+            "root_folder_id": Folder.get_root_folder_id(),
             "preferences": request.user.preferences,
         }
         return Response(res_data, status=HTTP_200_OK)
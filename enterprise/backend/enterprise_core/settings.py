@@ -214,6 +214,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_structlog.middlewares.RequestMiddleware",
     "core.custom_middleware.AuditlogMiddleware",
+    "core.custom_middleware.RequestCacheMiddleware",
     "allauth.account.middleware.AccountMiddleware",
 ]
 
@@ -248,6 +249,8 @@ EMAIL_HOST_PASSWORD_RESCUE = os.environ.get("EMAIL_HOST_PASSWORD_RESCUE")
 EMAIL_USE_TLS_RESCUE = os.environ.get("EMAIL_USE_TLS_RESCUE", "False") == "True"
 
 EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", default="5"))  # seconds
+# send user mails from the huey worker instead of the request
+ASYNC_MAILING = os.environ.get("ASYNC_MAILING", "False") == "True"
 
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [